@@ -17,8 +17,9 @@
  * - Metrics and reporting for pipeline monitoring
  * 
  * Requirements:
- * - Node.js 14+
- * - npm packages: fs, path, crypto, xml2js, csv-parser, commander
+ * - Node.js 16+
+ * - npm packages: fs, path, crypto, sax, csv-parser, commander, tdigest, piscina, ajv,
+ *   cli-progress (loaded only when stderr is a terminal)
  * 
  * Usage:
  *   node ml-pipeline.js [command] [options]
@@ -28,19 +29,34 @@
  */
 
 const fs = require('fs').promises;
+const { constants: fsConstants, createReadStream, createWriteStream } = require('fs');
+const os = require('os');
 const path = require('path');
 const crypto = require('crypto');
-const { program } = require('commander');
-const xml2js = require('xml2js');
+const { program, Option, InvalidArgumentError } = require('commander');
+const sax = require('sax');
 const csv = require('csv-parser');
+const { Digest } = require('tdigest');
+const Piscina = require('piscina');
+const Ajv = require('ajv');
 const { Transform } = require('stream');
+const { pipeline } = require('stream/promises');
+
+// Widen the libuv threadpool for concurrent fs calls; it is sized on first use
+if (require.main === module && !process.env.UV_THREADPOOL_SIZE) {
+  process.env.UV_THREADPOOL_SIZE = String(Math.max(4, os.cpus().length * 2));
+}
 
 // Configuration
 const CONFIG = {
   RFC_VERSION: 'draft-williams-ai-content-tagging-00',
   SUPPORTED_ORIGINS: ['human', 'ai', 'hybrid'],
   BATCH_SIZE: 1000,
+  CONCURRENCY: 64, // files read and hashed at once
+  WORKER_THREADS: os.cpus().length, // 0 processes files on the main thread
   MAX_FILE_SIZE: 10 * 1024 * 1024, // 10MB
+  CACHE_FILE: process.env.ML_PIPELINE_CACHE ?? '.ml-pipeline-cache.json', // empty string disables
+  COPY_MODE: 'reflink', // one of COPY_MODES
   QUALITY_THRESHOLDS: {
     min_content_length: 50,
     max_content_length: 1000000,
@@ -49,18 +65,164 @@ const CONFIG = {
   }
 };
 
+// Sidecar fields consumed by the pipeline
+const REQUIRED_FIELDS = ['origin', 'author', 'timestamp', 'content_hash', 'rfc_version'];
+const SIDECAR_FIELDS = [...REQUIRED_FIELDS, 'creation_tool'];
+const SIDECAR_FIELD_SET = new Set(SIDECAR_FIELDS);
+
+// Compiled once at load: required fields must be non-empty strings and the
+// origin must be one of CONFIG.SUPPORTED_ORIGINS
+const ajv = new Ajv();
+const validateMetadata = ajv.compile({
+  type: 'object',
+  required: REQUIRED_FIELDS,
+  properties: {
+    ...Object.fromEntries(REQUIRED_FIELDS.map((field) => [field, { type: 'string', minLength: 1 }])),
+    origin: { enum: CONFIG.SUPPORTED_ORIGINS }
+  }
+});
+
+// Shared by every sidecar parser; sax parsers themselves hold per-document
+// state and sidecars are parsed concurrently, so each parse gets its own
+const SAX_OPTIONS = { trim: true };
+
+// SHA-256 hex digest; uses the one-shot crypto.hash() on Node 20.12+/21.7+
+const sha256Hex = typeof crypto.hash === 'function'
+  ? (data) => crypto.hash('sha256', data, 'hex')
+  : (data) => crypto.createHash('sha256').update(data).digest('hex');
+
+// Stream a file through SHA-256 without buffering or decoding it
+async function hashFile(filePath) {
+  const hash = crypto.createHash('sha256');
+  let size = 0;
+  
+  for await (const chunk of createReadStream(filePath)) {
+    hash.update(chunk);
+    size += chunk.length;
+  }
+  
+  return { digest: hash.digest('hex'), size };
+}
+
+// Stream chunks from an async iterable into a file with backpressure; on
+// failure the stream is destroyed and any partially written file removed
+async function writeStreamed(outputPath, chunks) {
+  const output = createWriteStream(outputPath);
+  let opened = false;
+  output.once('open', () => {
+    opened = true;
+  });
+  
+  try {
+    await pipeline(chunks, output);
+  } catch (error) {
+    // The file may still be opening when the source fails; wait for it to close
+    if (!output.closed) {
+      await new Promise((resolve) => output.once('close', resolve));
+    }
+    if (opened) {
+      await fs.unlink(outputPath).catch(() => {});
+    }
+    throw error;
+  }
+}
+
+// Largest seed mulberry32 can tell apart; its state is a single 32-bit word
+const MAX_SEED = 0xFFFFFFFF;
+
+// Seedable mulberry32 PRNG returning floats in [0, 1); seeds are 0..MAX_SEED
+function mulberry32(seed) {
+  let state = seed >>> 0;
+  return () => {
+    state = (state + 0x6D2B79F5) >>> 0;
+    let t = state;
+    t = Math.imul(t ^ (t >>> 15), t | 1);
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+// Unbiased in-place Fisher-Yates shuffle
+function shuffle(items, rng) {
+  for (let i = items.length - 1; i > 0; i--) {
+    const j = Math.floor(rng() * (i + 1));
+    [items[i], items[j]] = [items[j], items[i]];
+  }
+  return items;
+}
+
+// Run an async task(item, index) over items with at most `limit` of them in
+// flight; a limit below 1 (or NaN) runs them one at a time rather than not at all
+async function forEachConcurrent(items, limit, task) {
+  let next = 0;
+  const width = limit >= 1 ? Math.floor(limit) : 1;
+  const runners = Array.from({ length: Math.min(width, items.length) }, async () => {
+    while (next < items.length) {
+      const index = next++;
+      await task(items[index], index);
+    }
+  });
+  await Promise.all(runners);
+}
+
+// Ways cloneFile can place an output file
+const COPY_MODES = ['hardlink', 'reflink', 'copy'];
+
+// Place a copy of src at dst; hardlink and reflink fall back when unsupported
+async function cloneFile(src, dst, mode) {
+  switch (mode) {
+    case 'hardlink':
+      try {
+        await fs.link(src, dst);
+        return;
+      } catch (error) {
+        // Replace a previous output rather than truncating a shared inode
+        if (error.code === 'EEXIST') {
+          await fs.unlink(dst);
+          await fs.link(src, dst);
+          return;
+        }
+      }
+      // Links cannot cross filesystems; fall back to a reflink
+      // falls through
+    case 'reflink':
+      // COPYFILE_FICLONE silently degrades to a full copy without copy-on-write support
+      await fs.copyFile(src, dst, fsConstants.COPYFILE_FICLONE);
+      break;
+    case 'copy':
+      await fs.copyFile(src, dst);
+      break;
+    default:
+      throw new Error(`Unsupported copy mode: ${mode}`);
+  }
+}
+
 // Utility functions
+const DEBUG = Boolean(process.env.DEBUG);
+
 const logger = {
   info: (msg) => console.log(`[INFO] ${new Date().toISOString()} - ${msg}`),
   warn: (msg) => console.warn(`[WARN] ${new Date().toISOString()} - ${msg}`),
   error: (msg) => console.error(`[ERROR] ${new Date().toISOString()} - ${msg}`),
   debug: (msg) => {
-    if (process.env.DEBUG) {
+    if (DEBUG) {
       console.log(`[DEBUG] ${new Date().toISOString()} - ${msg}`);
     }
   }
 };
 
+// Progress bar on stderr, redrawn every two seconds; a no-op when stderr is not a TTY
+function createProgress(total) {
+  if (!process.stderr.isTTY) {
+    return { increment() {}, stop() {} };
+  }
+  
+  const cliProgress = require('cli-progress');
+  const bar = new cliProgress.SingleBar({ stream: process.stderr, fps: 0.5 }, cliProgress.Presets.shades_classic);
+  bar.start(total, 0);
+  return bar;
+}
+
 /**
  * Content Classification Pipeline
  */
@@ -80,25 +242,119 @@ class ContentClassificationPipeline {
       hybridFiles: 0,
       errors: []
     };
+    this.cache = null;
+    this.cacheUpdates = 0;
+  }
+
+  /**
+   * Load the on-disk cache of sidecar metadata and integrity verdicts
+   */
+  loadCache() {
+    if (!this.cache) {
+      this.cache = (async () => {
+        try {
+          const content = await fs.readFile(this.options.CACHE_FILE, 'utf8');
+          return new Map(Object.entries(JSON.parse(content)));
+        } catch (error) {
+          if (error.code !== 'ENOENT') {
+            logger.warn(`Ignoring unreadable cache ${this.options.CACHE_FILE}: ${error.message}`);
+          }
+          return new Map();
+        }
+      })();
+    }
+    return this.cache;
+  }
+
+  /**
+   * Write pending cache updates back to disk
+   *
+   * The cache is an optimization, so a failed write is logged and ignored.
+   */
+  async saveCache() {
+    if (!this.cache || this.cacheUpdates === 0) {
+      return;
+    }
+    
+    const cache = await this.cache;
+    try {
+      await fs.writeFile(this.options.CACHE_FILE, JSON.stringify(Object.fromEntries(cache)));
+      this.cacheUpdates = 0;
+    } catch (error) {
+      logger.warn(`Could not write cache ${this.options.CACHE_FILE}: ${error.message}`);
+    }
+  }
+
+  /**
+   * Cache fingerprint for a content file and its sidecar, or null if either is missing
+   */
+  async getCacheFingerprint(contentPath) {
+    try {
+      const [content, sidecar] = await Promise.all([
+        fs.stat(contentPath),
+        fs.stat(`${contentPath}.meta.xml`)
+      ]);
+      return `${content.mtimeMs}:${content.size}:${sidecar.mtimeMs}:${sidecar.size}`;
+    } catch (error) {
+      return null;
+    }
   }
 
   /**
    * Parse XML sidecar file to extract metadata
+   *
+   * Streams the sidecar through a SAX parser and stops reading as soon as
+   * every field in SIDECAR_FIELDS has been captured.
    */
   async parseSidecarFile(sidecarPath) {
     try {
-      const xmlContent = await fs.readFile(sidecarPath, 'utf8');
-      const parser = new xml2js.Parser({ explicitArray: false });
-      const result = await parser.parseStringPromise(xmlContent);
-      
-      const metadata = result.content_metadata || {};
-      
-      // Validate required fields
-      const requiredFields = ['origin', 'author', 'timestamp', 'content_hash', 'rfc_version'];
-      for (const field of requiredFields) {
-        if (!metadata[field]) {
-          throw new Error(`Missing required field: ${field}`);
+      const metadata = {};
+      const parser = sax.parser(true, SAX_OPTIONS);
+      let currentField = null;
+      let pending = SIDECAR_FIELDS.length;
+      let done = false;
+
+      parser.onerror = (error) => {
+        throw error;
+      };
+      parser.onopentag = (node) => {
+        // Only the first occurrence of a direct child of the content_metadata root is a field
+        const tags = parser.tags;
+        if (tags.length === 2 && tags[0].name === 'content_metadata' &&
+            SIDECAR_FIELD_SET.has(node.name) && !(node.name in metadata)) {
+          currentField = node.name;
+          metadata[currentField] = '';
+        }
+      };
+      parser.ontext = parser.oncdata = (text) => {
+        if (currentField) {
+          metadata[currentField] += text;
         }
+      };
+      parser.onclosetag = (name) => {
+        if (name === currentField) {
+          currentField = null;
+          if (--pending === 0) {
+            done = true;
+          }
+        } else if (name === 'content_metadata') {
+          done = true;
+        }
+      };
+
+      for await (const chunk of createReadStream(sidecarPath, { encoding: 'utf8' })) {
+        parser.write(chunk);
+        if (done) {
+          break;
+        }
+      }
+      if (!done) {
+        parser.close();
+      }
+      
+      // Validate required fields and origin
+      if (!validateMetadata(metadata)) {
+        throw new Error(`Invalid metadata: ${ajv.errorsText(validateMetadata.errors, { dataVar: 'metadata' })}`);
       }
       
       return metadata;
@@ -110,57 +366,177 @@ class ContentClassificationPipeline {
   /**
    * Verify content integrity using SHA-256 hash
    */
-  async verifyContentIntegrity(contentPath, expectedHash) {
+  verifyContentIntegrity(content, expectedHash) {
+    return sha256Hex(content) === expectedHash;
+  }
+
+  /**
+   * Parse the sidecar metadata for a content file
+   */
+  async loadMetadata(contentPath) {
+    const sidecarPath = `${contentPath}.meta.xml`;
+    
+    // Check if sidecar file exists
+    await fs.access(sidecarPath);
+    
+    return this.parseSidecarFile(sidecarPath);
+  }
+
+  /**
+   * Stat a content file and parse its sidecar metadata without reading the content
+   */
+  async readMetadataEntry(contentPath) {
+    try {
+      const [metadata, stat] = await Promise.all([
+        this.loadMetadata(contentPath),
+        fs.stat(contentPath)
+      ]);
+      
+      return { path: contentPath, metadata, buffer: null, size: stat.size, error: null };
+    } catch (error) {
+      logger.debug(`Failed to load ${contentPath}: ${error.message}`);
+      return { path: contentPath, metadata: null, buffer: null, size: 0, error: error.message };
+    }
+  }
+
+  /**
+   * Read the raw content for an entry from readMetadataEntry
+   */
+  async readEntryContent(entry) {
     try {
-      const content = await fs.readFile(contentPath, 'utf8');
-      const actualHash = crypto.createHash('sha256').update(content).digest('hex');
-      return actualHash === expectedHash;
+      entry.buffer = await fs.readFile(entry.path);
+      entry.size = entry.buffer.length;
     } catch (error) {
-      logger.error(`Failed to verify integrity for ${contentPath}: ${error.message}`);
-      return false;
+      logger.debug(`Failed to load ${entry.path}: ${error.message}`);
+      entry.error = error.message;
     }
+    return entry;
   }
 
   /**
    * Load and validate a single content file with its metadata
+   *
+   * With `includeContent: false` the file is hashed as a stream and never
+   * decoded, and `content` is null. Otherwise the bytes are read once and
+   * decoded only after they pass the integrity check.
+   *
+   * Metadata and integrity verdicts are cached by path, keyed on the
+   * mtime and size of the content and sidecar files, so repeated runs over
+   * an unchanged dataset skip sidecar parsing and hashing. Updates are kept
+   * in memory; call saveCache() once loading is done to persist them.
    */
-  async loadContentFile(contentPath) {
-    const sidecarPath = `${contentPath}.meta.xml`;
+  async loadContentFile(contentPath, { includeContent = true } = {}) {
+    const useCache = Boolean(this.options.CACHE_FILE);
+    const cacheKey = path.resolve(contentPath);
+    const fingerprint = useCache ? await this.getCacheFingerprint(contentPath) : null;
+    const cached = fingerprint ? (await this.loadCache()).get(cacheKey) : undefined;
+    let metadata, buffer, size, error, valid;
     
     try {
-      // Check if sidecar file exists
-      await fs.access(sidecarPath);
-      
-      // Parse metadata
-      const metadata = await this.parseSidecarFile(sidecarPath);
-      
-      // Verify integrity
-      const isValid = await this.verifyContentIntegrity(contentPath, metadata.content_hash);
-      if (!isValid) {
-        throw new Error('Content integrity verification failed');
+      // Entries written under older validation rules are re-parsed
+      if (cached && cached.fingerprint === fingerprint && validateMetadata(cached.metadata)) {
+        ({ metadata, size, valid } = cached);
+        if (valid && includeContent) {
+          buffer = await fs.readFile(contentPath);
+        }
+      } else {
+        metadata = await this.loadMetadata(contentPath);
+        
+        if (includeContent) {
+          buffer = await fs.readFile(contentPath);
+          size = buffer.length;
+          valid = this.verifyContentIntegrity(buffer, metadata.content_hash);
+        } else {
+          const { digest, size: hashedSize } = await hashFile(contentPath);
+          size = hashedSize;
+          valid = digest === metadata.content_hash;
+        }
+        
+        if (fingerprint) {
+          (await this.loadCache()).set(cacheKey, { fingerprint, metadata, size, valid });
+          this.cacheUpdates++;
+        }
       }
-      
-      // Load content
-      const content = await fs.readFile(contentPath, 'utf8');
-      
+    } catch (loadError) {
+      logger.debug(`Failed to load ${contentPath}: ${loadError.message}`);
+      error = loadError.message;
+      valid = false;
+    }
+    
+    if (valid) {
       return {
         path: contentPath,
-        content,
+        content: buffer ? buffer.toString('utf8') : null,
         metadata,
-        size: content.length,
+        size: buffer ? buffer.length : size,
         valid: true
       };
-    } catch (error) {
-      logger.debug(`Failed to load ${contentPath}: ${error.message}`);
-      return {
-        path: contentPath,
-        content: null,
-        metadata: null,
-        size: 0,
-        valid: false,
-        error: error.message
-      };
     }
+    
+    return {
+      path: contentPath,
+      content: null,
+      metadata: null,
+      size: 0,
+      valid: false,
+      error: error || 'Content integrity verification failed'
+    };
+  }
+
+  /**
+   * Load, filter and verify a single content file
+   *
+   * The sidecar is parsed and the content file stat'ed first; the file is
+   * read and hashed only if it passes the origin and length criteria, and
+   * then gets `selected: true`. The buffer is released before returning so
+   * the entry is cheap to post back from a worker thread.
+   */
+  async processFile(contentPath, { origins, minContentLength, maxContentLength }) {
+    const matches = ({ metadata, size }) =>
+      origins.includes(metadata.origin) && size >= minContentLength && size <= maxContentLength;
+    
+    const entry = await this.readMetadataEntry(contentPath);
+    if (!entry.error && matches(entry)) {
+      await this.readEntryContent(entry);
+      if (!entry.error && !this.verifyContentIntegrity(entry.buffer, entry.metadata.content_hash)) {
+        entry.error = 'Content integrity verification failed';
+      }
+    }
+    
+    entry.buffer = null;
+    entry.selected = !entry.error && matches(entry);
+    return entry;
+  }
+
+  /**
+   * Start a worker pool for processFile over `fileCount` files, or return
+   * null when disabled or when the files fit on the main thread
+   *
+   * Each worker runs its share of CONCURRENCY tasks at once, since most of
+   * a task's time is spent waiting on file I/O. Only as many workers as
+   * can be given a full share are started, up to WORKER_THREADS, so a
+   * small dataset does not pay for threads that each load this module.
+   */
+  createWorkerPool(fileCount) {
+    const maxThreads = this.options.WORKER_THREADS;
+    if (!maxThreads) {
+      return null;
+    }
+    
+    const share = Math.max(1, Math.ceil(this.options.CONCURRENCY / maxThreads) || 1);
+    const threads = Math.min(maxThreads, Math.floor(fileCount / share));
+    if (threads < 1) {
+      return null;
+    }
+    
+    return new Piscina({
+      filename: path.join(__dirname, 'workers', 'hashparse.js'),
+      // Workers load the pipeline from this file under whatever name it has
+      workerData: { modulePath: __filename },
+      minThreads: threads,
+      maxThreads: threads,
+      concurrentTasksPerWorker: Math.max(1, Math.ceil(this.options.CONCURRENCY / threads) || 1)
+    });
   }
 
   /**
@@ -171,9 +547,15 @@ class ContentClassificationPipeline {
       origins = ['human'],
       minContentLength = this.options.QUALITY_THRESHOLDS.min_content_length,
       maxContentLength = this.options.QUALITY_THRESHOLDS.max_content_length,
-      requireIntegrity = true
+      requireIntegrity = true,
+      copyMode = this.options.COPY_MODE
     } = filterOptions;
 
+    // Fail before any files are parsed or hashed
+    if (!COPY_MODES.includes(copyMode)) {
+      throw new Error(`Unsupported copy mode: ${copyMode}`);
+    }
+
     logger.info(`Filtering dataset from ${inputDir} to ${outputDir}`);
     logger.info(`Filter criteria: origins=${origins.join(',')}, minLength=${minContentLength}, maxLength=${maxContentLength}`);
 
@@ -186,78 +568,87 @@ class ContentClassificationPipeline {
 
     logger.info(`Found ${contentFiles.length} content files`);
 
+    const criteria = { origins, minContentLength, maxContentLength };
     const filteredFiles = [];
     const batchSize = this.options.BATCH_SIZE;
+    const concurrency = this.options.CONCURRENCY;
+    
+    let progress = null;
+    let pool = null;
 
-    for (let i = 0; i < contentFiles.length; i += batchSize) {
-      const batch = contentFiles.slice(i, i + batchSize);
+    try {
+      // Started inside the try so the finally below cleans up whatever was started
+      progress = createProgress(contentFiles.length);
       
-      logger.info(`Processing batch ${Math.floor(i / batchSize) + 1}/${Math.ceil(contentFiles.length / batchSize)}`);
+      // Sidecar parsing and hashing run on worker threads when the dataset is
+      // large enough, one task per file, with up to `concurrency` files in
+      // flight and no barrier between them
+      pool = this.createWorkerPool(contentFiles.length);
+      const processFile = pool
+        ? (filePath) => pool.run({ path: filePath, criteria })
+        : (filePath) => this.processFile(filePath, criteria);
       
-      const batchPromises = batch.map(async (filePath) => {
-        const fileData = await this.loadContentFile(filePath);
-        this.stats.processedFiles++;
-        
-        if (!fileData.valid) {
-          this.stats.invalidFiles++;
-          this.stats.errors.push(`${filePath}: ${fileData.error}`);
-          return null;
-        }
-
-        // Apply filters
-        const { metadata, content, size } = fileData;
-        
-        // Check origin filter
-        if (!origins.includes(metadata.origin)) {
-          return null;
-        }
-        
-        // Check content length
-        if (size < minContentLength || size > maxContentLength) {
-          return null;
-        }
+      for (let i = 0; i < contentFiles.length; i += batchSize) {
+        const batch = contentFiles.slice(i, i + batchSize);
         
-        // Update statistics
-        this.stats.validFiles++;
-        switch (metadata.origin) {
-          case 'human':
-            this.stats.humanFiles++;
-            break;
-          case 'ai':
-            this.stats.aiFiles++;
-            break;
-          case 'hybrid':
-            this.stats.hybridFiles++;
-            break;
-        }
+        // Results keep input order regardless of completion order
+        const entries = new Array(batch.length);
+        await forEachConcurrent(batch, concurrency, async (filePath, index) => {
+          entries[index] = await processFile(filePath);
+        });
         
-        return fileData;
-      });
+        const validResults = [];
+        for (const entry of entries) {
+          this.stats.processedFiles++;
+          
+          if (entry.error) {
+            this.stats.invalidFiles++;
+            this.stats.errors.push(`${entry.path}: ${entry.error}`);
+            continue;
+          }
 
-      const batchResults = await Promise.all(batchPromises);
-      const validResults = batchResults.filter(result => result !== null);
-      
-      // Copy filtered files to output directory
-      for (const result of validResults) {
-        const relativePath = path.relative(inputDir, result.path);
-        const outputPath = path.join(outputDir, relativePath);
-        const outputSidecarPath = `${outputPath}.meta.xml`;
-        
-        // Ensure output subdirectory exists
-        await fs.mkdir(path.dirname(outputPath), { recursive: true });
-        
-        // Copy content file
-        await fs.copyFile(result.path, outputPath);
-        
-        // Copy sidecar file
-        await fs.copyFile(`${result.path}.meta.xml`, outputSidecarPath);
+          // Filters were applied by processFile
+          if (!entry.selected) {
+            continue;
+          }
+          const { metadata, size } = entry;
+          
+          // Update statistics; origin was validated against SUPPORTED_ORIGINS
+          this.stats.validFiles++;
+          this.stats[`${metadata.origin}Files`]++;
+          
+          validResults.push({ path: entry.path, metadata, size });
+        }
         
-        filteredFiles.push({
+        // Copy filtered files to output directory, overlapping the copies
+        const copiedFiles = validResults.map((result) => ({
           originalPath: result.path,
-          outputPath: outputPath,
+          outputPath: path.join(outputDir, path.relative(inputDir, result.path)),
           metadata: result.metadata,
           size: result.size
+        }));
+        
+        await forEachConcurrent(copiedFiles, concurrency, async ({ originalPath, outputPath }) => {
+          // Ensure output subdirectory exists
+          await fs.mkdir(path.dirname(outputPath), { recursive: true });
+          
+          // Copy content file
+          await cloneFile(originalPath, outputPath, copyMode);
+          
+          // Copy sidecar file
+          await cloneFile(`${originalPath}.meta.xml`, `${outputPath}.meta.xml`, copyMode);
         });
+        
+        filteredFiles.push(...copiedFiles);
+        
+        progress.increment(batch.length);
+      }
+    } finally {
+      if (progress) {
+        progress.stop();
+      }
+      if (pool) {
+        await pool.destroy();
       }
     }
 
@@ -267,12 +658,20 @@ class ContentClassificationPipeline {
 
   /**
    * Generate training dataset splits
+   *
+   * Pass an integer `seed` from 0 to 2^32 - 1 to make the shuffle, and so
+   * the splits, reproducible.
    */
-  async generateTrainingSplits(filteredFiles, splitRatios = { train: 0.8, validation: 0.1, test: 0.1 }) {
+  async generateTrainingSplits(filteredFiles, splitRatios = { train: 0.8, validation: 0.1, test: 0.1 }, seed) {
+    if (seed !== undefined && !(Number.isInteger(seed) && seed >= 0 && seed <= MAX_SEED)) {
+      throw new Error(`Invalid shuffle seed: ${seed}`);
+    }
+    
     logger.info('Generating training dataset splits');
     
     // Shuffle files
-    const shuffled = [...filteredFiles].sort(() => Math.random() - 0.5);
+    const rng = seed === undefined ? Math.random : mulberry32(seed);
+    const shuffled = shuffle(filteredFiles.slice(), rng);
     
     const totalFiles = shuffled.length;
     const trainSize = Math.floor(totalFiles * splitRatios.train);
@@ -291,8 +690,11 @@ class ContentClassificationPipeline {
 
   /**
    * Export dataset to various ML framework formats
+   *
+   * `dataset` may be an array or an async iterable of items; items are
+   * consumed one at a time as they are written.
    */
-  async exportToFormat(dataset, outputPath, format = 'csv') {
+  async exportToFormat(dataset, outputPath, format = 'csv', { pretty = false } = {}) {
     logger.info(`Exporting dataset to ${format} format: ${outputPath}`);
     
     switch (format.toLowerCase()) {
@@ -300,7 +702,7 @@ class ContentClassificationPipeline {
         await this.exportToCSV(dataset, outputPath);
         break;
       case 'json':
-        await this.exportToJSON(dataset, outputPath);
+        await this.exportToJSON(dataset, outputPath, { pretty });
         break;
       case 'jsonl':
         await this.exportToJSONL(dataset, outputPath);
@@ -312,61 +714,79 @@ class ContentClassificationPipeline {
 
   /**
    * Export to CSV format
+   *
+   * Items that already carry their `content` are not read from disk again.
    */
   async exportToCSV(dataset, outputPath) {
     const csvHeader = 'path,content,origin,author,timestamp,content_hash,size\n';
-    let csvContent = csvHeader;
     
-    for (const item of dataset) {
-      const content = await fs.readFile(item.outputPath, 'utf8');
-      const escapedContent = content.replace(/"/g, '""'); // Escape quotes
+    async function* rows() {
+      yield csvHeader;
       
-      csvContent += `"${item.outputPath}","${escapedContent}","${item.metadata.origin}","${item.metadata.author}","${item.metadata.timestamp}","${item.metadata.content_hash}",${item.size}\n`;
+      for await (const item of dataset) {
+        const content = item.content ?? await fs.readFile(item.outputPath, 'utf8');
+        const escapedContent = content.replace(/"/g, '""'); // Escape quotes
+        
+        yield `"${item.outputPath}","${escapedContent}","${item.metadata.origin}","${item.metadata.author}","${item.metadata.timestamp}","${item.metadata.content_hash}",${item.size}\n`;
+      }
     }
     
-    await fs.writeFile(outputPath, csvContent);
+    await writeStreamed(outputPath, rows());
   }
 
   /**
    * Export to JSON format
    */
-  async exportToJSON(dataset, outputPath) {
-    const jsonData = [];
+  async exportToJSON(dataset, outputPath, { pretty = false } = {}) {
+    // Records are streamed one at a time; pretty output matches JSON.stringify(array, null, 2)
+    const separator = pretty ? ',\n  ' : ',';
     
-    for (const item of dataset) {
-      const content = await fs.readFile(item.outputPath, 'utf8');
-      
-      jsonData.push({
-        path: item.outputPath,
-        content: content,
-        metadata: item.metadata,
-        size: item.size
-      });
+    async function* chunks() {
+      let prefix = pretty ? '[\n  ' : '[';
+      let empty = true;
+      
+      for await (const item of dataset) {
+        const content = item.content ?? await fs.readFile(item.outputPath, 'utf8');
+        
+        const record = {
+          path: item.outputPath,
+          content: content,
+          metadata: item.metadata,
+          size: item.size
+        };
+        const json = pretty ? JSON.stringify(record, null, 2).replace(/\n/g, '\n  ') : JSON.stringify(record);
+        
+        yield prefix + json;
+        prefix = separator;
+        empty = false;
+      }
+      
+      yield empty ? '[]' : (pretty ? '\n]' : ']');
     }
     
-    await fs.writeFile(outputPath, JSON.stringify(jsonData, null, 2));
+    await writeStreamed(outputPath, chunks());
   }
 
   /**
    * Export to JSONL format
    */
   async exportToJSONL(dataset, outputPath) {
-    let jsonlContent = '';
-    
-    for (const item of dataset) {
-      const content = await fs.readFile(item.outputPath, 'utf8');
-      
-      const jsonLine = JSON.stringify({
-        path: item.outputPath,
-        content: content,
-        metadata: item.metadata,
-        size: item.size
-      });
-      
-      jsonlContent += jsonLine + '\n';
+    async function* lines() {
+      for await (const item of dataset) {
+        const content = item.content ?? await fs.readFile(item.outputPath, 'utf8');
+        
+        const jsonLine = JSON.stringify({
+          path: item.outputPath,
+          content: content,
+          metadata: item.metadata,
+          size: item.size
+        });
+        
+        yield jsonLine + '\n';
+      }
     }
     
-    await fs.writeFile(outputPath, jsonlContent);
+    await writeStreamed(outputPath, lines());
   }
 
   /**
@@ -409,20 +829,26 @@ class ContentClassificationPipeline {
     
     async function walk(currentPath) {
       const entries = await fs.readdir(currentPath, { withFileTypes: true });
+      const subdirs = [];
       
       for (const entry of entries) {
         const fullPath = path.join(currentPath, entry.name);
         
         if (entry.isDirectory()) {
-          await walk(fullPath);
+          subdirs.push(walk(fullPath));
         } else if (entry.isFile() && !entry.name.endsWith('.meta.xml')) {
           files.push(fullPath);
         }
       }
+      
+      // Walk sibling directories concurrently
+      await Promise.all(subdirs);
     }
     
     await walk(dir);
-    return files;
+    
+    // Concurrent walks finish in any order; keep results deterministic
+    return files.sort();
   }
 }
 
@@ -430,6 +856,17 @@ class ContentClassificationPipeline {
  * Command-line interface
  */
 
+// Parser for integer options between `min` and `max`
+function integerOption(min, max = Number.MAX_SAFE_INTEGER) {
+  return (value) => {
+    const number = Number(value);
+    if (!/^-?\d+$/.test(value.trim()) || !Number.isSafeInteger(number) || number < min || number > max) {
+      throw new InvalidArgumentError(max < Number.MAX_SAFE_INTEGER ? `Must be an integer from ${min} to ${max}.` : `Must be an integer >= ${min}.`);
+    }
+    return number;
+  };
+}
+
 // Filter command
 program
   .command('filter')
@@ -440,9 +877,19 @@ program
   .option('--min-length <number>', 'Minimum content length', parseInt, CONFIG.QUALITY_THRESHOLDS.min_content_length)
   .option('--max-length <number>', 'Maximum content length', parseInt, CONFIG.QUALITY_THRESHOLDS.max_content_length)
   .option('--batch-size <number>', 'Batch processing size', parseInt, CONFIG.BATCH_SIZE)
+  .option('--concurrency <number>', 'Files read and hashed at once', integerOption(1), CONFIG.CONCURRENCY)
+  .option('--threads <number>', 'Worker threads for parsing and hashing (0 to disable)', integerOption(0), CONFIG.WORKER_THREADS)
+  .addOption(new Option('--copy-mode <mode>', 'How to place output files').choices(COPY_MODES).default(CONFIG.COPY_MODE))
+  .option('--pretty', 'Pretty-print the quality report (default when stdout is a terminal)')
+  .option('--no-pretty', 'Print the quality report as compact JSON')
   .action(async (options) => {
     try {
-      const pipeline = new ContentClassificationPipeline({ BATCH_SIZE: options.batchSize });
+      const pipeline = new ContentClassificationPipeline({
+        BATCH_SIZE: options.batchSize,
+        CONCURRENCY: options.concurrency,
+        WORKER_THREADS: options.threads,
+        COPY_MODE: options.copyMode
+      });
       const origins = options.origins.split(',').map(o => o.trim());
       
       const filteredFiles = await pipeline.filterDataset(options.input, options.output, {
@@ -455,8 +902,9 @@ program
       
       // Generate quality report
       const report = pipeline.generateQualityReport();
+      const pretty = options.pretty ?? Boolean(process.stdout.isTTY);
       console.log('\n=== Quality Report ===');
-      console.log(JSON.stringify(report, null, 2));
+      console.log(JSON.stringify(report, null, pretty ? 2 : undefined));
       
     } catch (error) {
       logger.error(`Filter operation failed: ${error.message}`);
@@ -473,16 +921,18 @@ program
   .option('--train-ratio <number>', 'Training set ratio', parseFloat, 0.8)
   .option('--validation-ratio <number>', 'Validation set ratio', parseFloat, 0.1)
   .option('--test-ratio <number>', 'Test set ratio', parseFloat, 0.1)
+  .addOption(new Option('--copy-mode <mode>', 'How to place output files').choices(COPY_MODES).default(CONFIG.COPY_MODE))
+  .option('--seed <number>', 'Seed (0 to 4294967295) for a reproducible shuffle', integerOption(0, MAX_SEED))
   .action(async (options) => {
     try {
-      const pipeline = new ContentClassificationPipeline();
+      const pipeline = new ContentClassificationPipeline({ COPY_MODE: options.copyMode });
       
       // Load filtered files
       const contentFiles = await pipeline.findContentFiles(options.input);
       const filteredFiles = [];
       
       for (const filePath of contentFiles) {
-        const fileData = await pipeline.loadContentFile(filePath);
+        const fileData = await pipeline.loadContentFile(filePath, { includeContent: false });
         if (fileData.valid) {
           filteredFiles.push({
             originalPath: filePath,
@@ -493,27 +943,37 @@ program
         }
       }
       
+      await pipeline.saveCache();
+      
       // Generate splits
       const splits = await pipeline.generateTrainingSplits(filteredFiles, {
         train: options.trainRatio,
         validation: options.validationRatio,
         test: options.testRatio
-      });
+      }, options.seed);
       
       // Create output directories and copy files
       for (const [splitName, splitFiles] of Object.entries(splits)) {
         const splitDir = path.join(options.output, splitName);
         await fs.mkdir(splitDir, { recursive: true });
         
+        // Files are named by basename, so inputs from different directories can
+        // share a destination; as with copying in order, the last one wins, and
+        // each destination is written by a single task with its own sidecar
+        const byDestination = new Map();
         for (const fileInfo of splitFiles) {
-          const fileName = path.basename(fileInfo.outputPath);
-          const outputPath = path.join(splitDir, fileName);
-          const outputSidecarPath = `${outputPath}.meta.xml`;
-          
-          await fs.copyFile(fileInfo.outputPath, outputPath);
-          await fs.copyFile(`${fileInfo.outputPath}.meta.xml`, outputSidecarPath);
+          const outputPath = path.join(splitDir, path.basename(fileInfo.outputPath));
+          if (byDestination.has(outputPath)) {
+            logger.warn(`${fileInfo.outputPath} replaces ${byDestination.get(outputPath).outputPath} at ${outputPath}`);
+          }
+          byDestination.set(outputPath, fileInfo);
         }
         
+        await forEachConcurrent([...byDestination], pipeline.options.CONCURRENCY, async ([outputPath, fileInfo]) => {
+          await cloneFile(fileInfo.outputPath, outputPath, pipeline.options.COPY_MODE);
+          await cloneFile(`${fileInfo.outputPath}.meta.xml`, `${outputPath}.meta.xml`, pipeline.options.COPY_MODE);
+        });
+        
         logger.info(`Created ${splitName} split with ${splitFiles.length} files`);
       }
       
@@ -530,30 +990,39 @@ program
   .requiredOption('-i, --input <dir>', 'Input dataset directory')
   .requiredOption('-o, --output <file>', 'Output file path')
   .option('-f, --format <format>', 'Export format (csv, json, jsonl)', 'csv')
+  .option('--pretty', 'Pretty-print JSON output')
   .action(async (options) => {
     try {
       const pipeline = new ContentClassificationPipeline();
       
-      // Load dataset
+      // Load each file as the exporter reaches it, so only one is held in memory
       const contentFiles = await pipeline.findContentFiles(options.input);
-      const dataset = [];
+      let exportedFiles = 0;
       
-      for (const filePath of contentFiles) {
-        const fileData = await pipeline.loadContentFile(filePath);
-        if (fileData.valid) {
-          dataset.push({
-            originalPath: filePath,
-            outputPath: filePath,
-            metadata: fileData.metadata,
-            size: fileData.size
-          });
+      async function* loadDataset() {
+        for (const filePath of contentFiles) {
+          const fileData = await pipeline.loadContentFile(filePath);
+          if (fileData.valid) {
+            exportedFiles++;
+            yield {
+              originalPath: filePath,
+              outputPath: filePath,
+              metadata: fileData.metadata,
+              size: fileData.size,
+              content: fileData.content
+            };
+          }
         }
       }
       
       // Export to specified format
-      await pipeline.exportToFormat(dataset, options.output, options.format);
+      try {
+        await pipeline.exportToFormat(loadDataset(), options.output, options.format, { pretty: Boolean(options.pretty) });
+      } finally {
+        await pipeline.saveCache();
+      }
       
-      logger.info(`Export completed: ${dataset.length} files exported to ${options.output}`);
+      logger.info(`Export completed: ${exportedFiles} files exported to ${options.output}`);
       
     } catch (error) {
       logger.error(`Export operation failed: ${error.message}`);
@@ -567,6 +1036,8 @@ program
   .description('Validate dataset quality and integrity')
   .requiredOption('-i, --input <dir>', 'Input dataset directory')
   .option('-r, --report <file>', 'Save quality report to file')
+  .option('--pretty', 'Pretty-print the report (default when stdout is a terminal)')
+  .option('--no-pretty', 'Print the report as compact JSON')
   .action(async (options) => {
     try {
       const pipeline = new ContentClassificationPipeline();
@@ -575,39 +1046,32 @@ program
       const contentFiles = await pipeline.findContentFiles(options.input);
       
       for (const filePath of contentFiles) {
-        const fileData = await pipeline.loadContentFile(filePath);
+        const fileData = await pipeline.loadContentFile(filePath, { includeContent: false });
         pipeline.stats.processedFiles++;
         
         if (fileData.valid) {
           pipeline.stats.validFiles++;
-          switch (fileData.metadata.origin) {
-            case 'human':
-              pipeline.stats.humanFiles++;
-              break;
-            case 'ai':
-              pipeline.stats.aiFiles++;
-              break;
-            case 'hybrid':
-              pipeline.stats.hybridFiles++;
-              break;
-          }
+          pipeline.stats[`${fileData.metadata.origin}Files`]++;
         } else {
           pipeline.stats.invalidFiles++;
           pipeline.stats.errors.push(`${filePath}: ${fileData.error}`);
         }
       }
       
+      await pipeline.saveCache();
+      
       pipeline.stats.totalFiles = contentFiles.length;
       
       // Generate quality report
       const report = pipeline.generateQualityReport();
       
+      const pretty = options.pretty ?? Boolean(process.stdout.isTTY);
       console.log('\n=== Dataset Validation Report ===');
-      console.log(JSON.stringify(report, null, 2));
+      console.log(JSON.stringify(report, null, pretty ? 2 : undefined));
       
-      // Save report if requested
+      // Save report if requested; files are compact unless --pretty is given
       if (options.report) {
-        await fs.writeFile(options.report, JSON.stringify(report, null, 2));
+        await fs.writeFile(options.report, JSON.stringify(report, null, options.pretty ? 2 : undefined));
         logger.info(`Quality report saved to ${options.report}`);
       }
       
@@ -627,6 +1091,8 @@ program
   .command('stats')
   .description('Generate dataset statistics')
   .requiredOption('-i, --input <dir>', 'Input dataset directory')
+  .option('--pretty', 'Pretty-print the statistics (default when stdout is a terminal)')
+  .option('--no-pretty', 'Print the statistics as compact JSON')
   .action(async (options) => {
     try {
       const pipeline = new ContentClassificationPipeline();
@@ -638,20 +1104,25 @@ program
         validFiles: 0,
         invalidFiles: 0,
         origins: { human: 0, ai: 0, hybrid: 0 },
-        contentLengths: [],
         authors: {},
         creationTools: {},
         avgContentLength: 0,
         medianContentLength: 0
       };
+      // Mean from a running total, median from a digest that stays exact
+      // (one centroid per distinct size) until sizes are mostly unique past
+      // 1000 files, then compresses into a t-digest estimate
+      const contentLengths = new Digest();
+      let totalContentLength = 0;
       
       for (const filePath of contentFiles) {
-        const fileData = await pipeline.loadContentFile(filePath);
+        const fileData = await pipeline.loadContentFile(filePath, { includeContent: false });
         
         if (fileData.valid) {
           stats.validFiles++;
           stats.origins[fileData.metadata.origin]++;
-          stats.contentLengths.push(fileData.size);
+          contentLengths.push(fileData.size);
+          totalContentLength += fileData.size;
           
           // Track authors
           const author = fileData.metadata.author || 'unknown';
@@ -667,15 +1138,20 @@ program
         }
       }
       
+      await pipeline.saveCache();
+      
       // Calculate content length statistics
-      if (stats.contentLengths.length > 0) {
-        stats.avgContentLength = stats.contentLengths.reduce((a, b) => a + b, 0) / stats.contentLengths.length;
-        const sorted = stats.contentLengths.sort((a, b) => a - b);
-        stats.medianContentLength = sorted[Math.floor(sorted.length / 2)];
+      if (stats.validFiles > 0) {
+        stats.avgContentLength = totalContentLength / stats.validFiles;
+        // sorted[floor(n / 2)], queried mid-rank so an exact digest lands inside
+        // that sample's bucket; rounded to whole bytes once estimated
+        const medianRank = (Math.floor(stats.validFiles / 2) + 0.5) / stats.validFiles;
+        stats.medianContentLength = Math.round(contentLengths.percentile(medianRank));
       }
       
+      const pretty = options.pretty ?? Boolean(process.stdout.isTTY);
       console.log('\n=== Dataset Statistics ===');
-      console.log(JSON.stringify(stats, null, 2));
+      console.log(JSON.stringify(stats, null, pretty ? 2 : undefined));
       
     } catch (error) {
       logger.error(`Stats operation failed: ${error.message}`);
@@ -689,11 +1165,11 @@ program
   .description('AI Content Classification ML Pipeline Tools')
   .version('1.0.0');
 
-// Parse arguments
-program.parse();
-
 // Example usage in code
 if (require.main === module) {
+  // Parse arguments; skipped when loaded as a module, e.g. by the worker pool
+  program.parse();
+  
   // This section runs when the script is executed directly
   // but not when it's required as a module
   
@@ -0,0 +1,23 @@
+/**
+ * AI Content Classification RFC - Filter Worker
+ * =============================================
+ *
+ * Piscina worker used by ContentClassificationPipeline.filterDataset.
+ * Each task is one content file path plus the filter criteria; the
+ * worker parses the sidecar, applies the origin and length filters, and
+ * reads and hashes the file only if it passes. It posts back a single
+ * entry ({ path, metadata, size, selected, error }) without the content
+ * buffer, so nothing large crosses the thread boundary.
+ *
+ * Author: AI Content Classification RFC Working Group
+ * License: MIT
+ */
+
+const { workerData } = require('piscina');
+
+// The pipeline module passes its own path, so it can be copied or renamed
+const { ContentClassificationPipeline } = require(workerData.modulePath);
+
+const pipeline = new ContentClassificationPipeline();
+
+module.exports = ({ path, criteria }) => pipeline.processFile(path, criteria);